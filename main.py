@@ -1,152 +1,585 @@
 import requests
+from requests.adapters import HTTPAdapter
 import cv2
 import numpy as np
 from ultralytics import YOLO
+import torch
+import torch.nn.functional as F
 import pyttsx3
-from PIL import Image
-import io
 import time
 import os
-from datetime import datetime
 import socket
-import netifaces
+import ipaddress
 import concurrent.futures
-from typing import Optional
+import threading
+import queue
+import re
+import subprocess
+import importlib.util
+from typing import List, Optional
+
+try:
+    from zeroconf import Zeroconf, ServiceBrowser
+except ImportError:
+    Zeroconf = None
 
 class ESP32ObjectDetector:
-    def __init__(self, capture_interval=2):
+    def __init__(self, capture_interval=0, batch_size=1):
         self.capture_interval = capture_interval
+        self.batch_size = batch_size
+        self.imgsz = 640
+        # Shape of the VGA frames configure_camera asks the ESP32 for
+        self.frame_shape = (480, 640, 3)
+        # At most one batch of frames is pending; stale frames are dropped, bounding latency
+        self.frames = queue.Queue(maxsize=batch_size)
+        self._stop = threading.Event()
+        # Frames whose 32x32 thumbnail differs less than this from the last are skipped
+        self.diff_threshold = 2.0
+        self._prev_small = None
         self.esp32_url = None
-        self.model = YOLO('yolov8n.pt')
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate', 150)
-        self.last_announced = set()
+        # Persistent session so the TCP connection to the ESP32 is kept alive
+        self.http = requests.Session()
+        self.http.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        self._local = threading.local()
+        self.model = self.load_model('yolov8n.pt')
+        # Class names are fixed for the model, index them once
+        self._names = tuple(self.model.names[i] for i in range(len(self.model.names)))
+        # Per-class box color and label prefix, computed once
+        self._colors = [tuple(int(c) for c in np.random.RandomState(i).randint(0, 255, 3))
+                        for i in range(len(self._names))]
+        self._label_fmt = [f"{name} " for name in self._names]
+        # Reusable per-slot pinned host and device buffers (sized to the frame),
+        # device buffer for FP16 model input, and per-slot letterbox (scale, left, top)
+        self._pinned = [None] * self.batch_size
+        self._frame_gpu = [None] * self.batch_size
+        self._float_gpu = [None] * self.batch_size
+        self._letterbox = [(1.0, 0, 0)] * self.batch_size
+        self._gpu = None
+        if torch.cuda.is_available():
+            shape = (self.batch_size, 3, self.imgsz, self.imgsz)
+            self._gpu = torch.empty(shape, dtype=torch.float16, device='cuda')
+        self.warmup()
+        # Speech runs on its own thread so runAndWait() never stalls detection
+        # Latest-only: a phrase not yet spoken is replaced by a newer one
+        self._tts_q = queue.Queue(maxsize=1)
+        self._tts_ready = threading.Event()
+        self._tts_ok = False
+        threading.Thread(target=self.speech_loop, daemon=True).start()
+        if not self._tts_ready.wait(timeout=10):
+            print("Text-to-speech engine is still initializing")
+        elif not self._tts_ok:
+            print("Text-to-speech disabled, detections will only be printed")
+        self.last_announced = frozenset()
+        self._last_key = None
+        self._last_str = ''
+        # Saves are limited to one per save_interval; a changed object set may
+        # save sooner, but never more often than min_save_interval
+        self.save_interval = 2.0
+        self.min_save_interval = 0.5
+        self._last_save = 0.0
         self.output_dir = 'captured_images'
+        self._out_prefix = self.output_dir + os.sep
+        self._writer = concurrent.futures.ThreadPoolExecutor(max_workers=1)
         os.makedirs(self.output_dir, exist_ok=True)
         
         # Find ESP32 camera
         self.discover_esp32()
         if not self.esp32_url:
             raise Exception("Could not find ESP32 camera on the network")
+        self.configure_camera()
         
         cv2.namedWindow('ESP32 Camera Feed', cv2.WINDOW_NORMAL)
 
+    def load_model(self, weights: str) -> YOLO:
+        """Load a TensorRT FP16 engine for this GPU, exporting it on first run"""
+        self.static_batch = False
+        if not torch.cuda.is_available():
+            return YOLO(weights)
+        # Without TensorRT, exporting would make Ultralytics try to pip-install it on every start
+        if importlib.util.find_spec('tensorrt') is None:
+            print("TensorRT not installed, using PyTorch weights")
+            return YOLO(weights)
+        
+        # Engines are tied to the GPU they were built on, so cache one per card
+        device_name = torch.cuda.get_device_name().replace(' ', '_')
+        engine_path = f"{os.path.splitext(weights)[0]}_{device_name}_b{self.batch_size}.engine"
+        if not os.path.exists(engine_path):
+            # The export goes through an intermediate ONNX file; only remove it if we made it
+            onnx_path = f"{os.path.splitext(weights)[0]}.onnx"
+            onnx_existed = os.path.exists(onnx_path)
+            try:
+                print(f"Exporting TensorRT engine: {engine_path}")
+                exported = YOLO(weights).export(format='engine', half=True, imgsz=self.imgsz,
+                                                dynamic=False, batch=self.batch_size)
+                os.replace(exported, engine_path)
+            except Exception as e:
+                print(f"TensorRT export failed, using PyTorch weights: {str(e)}")
+                return YOLO(weights)
+            finally:
+                if not onnx_existed and os.path.exists(onnx_path):
+                    os.remove(onnx_path)
+        
+        self.static_batch = True
+        return YOLO(engine_path, task='detect')
+
+    def warmup(self):
+        """Run one dummy batch so CUDA/cuDNN/TensorRT setup doesn't delay the first real frame"""
+        # Input shape is fixed, so let cuDNN benchmark and keep the fastest algorithms
+        torch.backends.cudnn.benchmark = True
+        # Use the camera's frame shape so the first real frame reuses the same buffers
+        dummy = np.zeros(self.frame_shape, dtype=np.uint8)
+        self.detect_objects([dummy] * self.batch_size, verbose=False)
+
+    def _thread_session(self) -> requests.Session:
+        """Get the HTTP session owned by the calling scanner thread"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
     def verify_esp32_camera(self, ip: str) -> Optional[str]:
         """Verify if IP hosts an ESP32 camera by checking image capture"""
         base_url = f"http://{ip}"
+        session = self._thread_session()
         try:
-            # First check if server responds
-            status = requests.get(f"{base_url}/status", timeout=1)
-            if status.status_code != 200:
-                return None
-                
-            # Then verify camera functionality
-            capture = requests.get(f"{base_url}/capture", timeout=2)
-            if capture.status_code != 200:
-                return None
-                
-            # Verify we got an image
-            try:
-                Image.open(io.BytesIO(capture.content))
-                print(f"Valid ESP32 camera found at: {base_url}")
-                return base_url
-            except:
-                return None
+            # Single request: only read far enough to see the JPEG header
+            with session.get(f"{base_url}/capture", timeout=1, stream=True) as capture:
+                if capture.status_code != 200:
+                    return None
+                if capture.raw.read(3) != b'\xff\xd8\xff':
+                    return None
+            print(f"Valid ESP32 camera found at: {base_url}")
+            return base_url
                 
         except requests.RequestException:
             return None
 
-    def get_default_gateway_network(self) -> tuple:
-        """Get default gateway IP and network range"""
-        gateways = netifaces.gateways()
-        if 'default' not in gateways or netifaces.AF_INET not in gateways['default']:
-            raise Exception("Default gateway not found")
+    def local_address(self) -> Optional[ipaddress.IPv4Address]:
+        """Get the IP of the interface used for outbound traffic"""
+        # Connecting a UDP socket sends nothing but picks the outbound interface
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            s.connect(('8.8.8.8', 80))
+            return ipaddress.ip_address(s.getsockname()[0])
+        except OSError:
+            return None
+        finally:
+            s.close()
+
+    def arp_hosts(self) -> List[str]:
+        """List IPs of hosts currently present in the ARP cache"""
+        try:
+            with open('/proc/net/arp') as f:
+                lines = f.readlines()[1:]
+            # Flags 0x0 marks an incomplete entry
+            candidates = [line.split()[0] for line in lines if line.split()[2] != '0x0']
+        except (OSError, IndexError):
+            try:
+                output = subprocess.run(['arp', '-a'], capture_output=True,
+                                        text=True, timeout=5).stdout
+            except (OSError, subprocess.SubprocessError):
+                return []
+            candidates = re.findall(r'\b(\d{1,3}(?:\.\d{1,3}){3})\b', output)
+        
+        # Skip our own interface, broadcast and multicast entries
+        local = self.local_address()
+        excluded = {ipaddress.ip_address('255.255.255.255')}
+        if local is not None:
+            excluded.add(local)
+            excluded.add(ipaddress.ip_network(f"{local}/24", strict=False).broadcast_address)
+        
+        hosts = []
+        for candidate in candidates:
+            try:
+                addr = ipaddress.ip_address(candidate)
+            except ValueError:
+                continue
+            if addr.is_multicast or addr.is_unspecified or addr in excluded:
+                continue
+            hosts.append(candidate)
+        return hosts
+
+    def mdns_hosts(self, timeout: float = 2.0) -> List[str]:
+        """List IPs advertising an esp32 HTTP service over mDNS"""
+        if Zeroconf is None:
+            return []
+        
+        found = []
+        done = threading.Event()
+        
+        class Listener:
+            def add_service(self, zc, type_, name):
+                if 'esp32' not in name.lower():
+                    return
+                info = zc.get_service_info(type_, name)
+                if info:
+                    found.extend(socket.inet_ntoa(addr) for addr in info.addresses
+                                 if len(addr) == 4)
+                    if found:
+                        done.set()
+            
+            def update_service(self, zc, type_, name):
+                pass
             
-        gateway = gateways['default'][netifaces.AF_INET][0]
-        base_ip = '.'.join(gateway.split('.')[:3])
+            def remove_service(self, zc, type_, name):
+                pass
+        
+        try:
+            zc = Zeroconf()
+        except OSError as e:
+            print(f"mDNS unavailable: {str(e)}")
+            return []
+        try:
+            ServiceBrowser(zc, '_http._tcp.local.', Listener())
+            # Return as soon as a camera answers rather than waiting out the timeout
+            done.wait(timeout)
+        except OSError as e:
+            print(f"mDNS lookup failed: {str(e)}")
+        finally:
+            zc.close()
+        return list(found)
+
+    def probe_hosts(self, ips: List[str]) -> Optional[str]:
+        """Verify candidate IPs in parallel, returning the first ESP32 camera URL"""
+        if not ips:
+            return None
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=50) as executor:
+            futures = [executor.submit(self.verify_esp32_camera, ip) for ip in ips]
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                if result:
+                    return result
+        return None
+
+    def get_local_networks(self) -> List[ipaddress.IPv4Network]:
+        """Get the local /24 network, plus its x.x.0/x.x.1 counterpart"""
+        local = self.local_address()
+        if local is None:
+            raise Exception("Local network address not found")
         
-        reverse_ip = None
-        # Calculate reverse IP based on third octet
-        third_octet = int(gateway.split('.')[-2])
-        if(third_octet != '0' or third_octet != '1'):
-            reverse_third = '1' if third_octet == 0 else '0'
-            reverse_ip = f"{'.'.join(gateway.split('.')[:2])}.{reverse_third}"
+        net = ipaddress.ip_network(f"{local}/24", strict=False)
+        networks = [net]
+        # Also scan the reverse network when the third octet is 0 or 1
+        third_octet = local.packed[2]
+        if third_octet in (0, 1):
+            reverse = ipaddress.ip_address(int(net.network_address) ^ 0x100)
+            networks.append(ipaddress.ip_network(f"{reverse}/24"))
         
-        return (base_ip, reverse_ip)
+        return networks
 
     def discover_esp32(self):
-        """Find ESP32 camera using parallel network scanning with reverse IP support"""
-        base_ip, reverse_ip = self.get_default_gateway_network()
-        if reverse_ip==None:
-            networks = [base_ip]
-        networks = [base_ip, reverse_ip]
-        
-        for network in networks:
-            print(f"Scanning network: {network}.0/24")
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=50) as executor:
-                future_to_ip = {
-                    executor.submit(self.verify_esp32_camera, f"{network}.{i}"): i 
-                    for i in range(1, 255)
-                }
-                
-                for future in concurrent.futures.as_completed(future_to_ip):
-                    result = future.result()
-                    if result:
-                        self.esp32_url = result
-                        return
+        """Find ESP32 camera via mDNS and the ARP cache, falling back to a subnet scan"""
+        print("Looking up ESP32 camera via mDNS and ARP cache")
+        candidates = list(dict.fromkeys(self.mdns_hosts() + self.arp_hosts()))
+        result = self.probe_hosts(candidates)
+        if result:
+            self.esp32_url = result
+            return
+        
+        for network in self.get_local_networks():
+            print(f"Scanning network: {network}")
+            result = self.probe_hosts([str(ip) for ip in network.hosts()])
+            if result:
+                self.esp32_url = result
+                return
 
         raise Exception("Could not find ESP32 camera on any network")
 
+    def configure_camera(self, framesize=8, quality=15):
+        """Ask the ESP32 for VGA frames at reduced JPEG quality to match the 640px model input"""
+        for var, val in (('framesize', framesize), ('quality', quality)):
+            try:
+                response = self.http.get(f"{self.esp32_url}/control",
+                                         params={'var': var, 'val': val}, timeout=2)
+                if response.status_code != 200:
+                    print(f"Camera rejected {var}={val}: HTTP {response.status_code}")
+            except requests.RequestException as e:
+                print(f"Error configuring camera {var}: {str(e)}")
+
     def capture_image(self):
         """Capture image from ESP32 camera"""
         try:
-            response = requests.get(f"{self.esp32_url}/capture?_cb={int(time.time())}", timeout=5)
+            response = self.http.get(f"{self.esp32_url}/capture", timeout=5)
             if response.status_code == 200:
-                image = Image.open(io.BytesIO(response.content))
-                return cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+                arr = np.frombuffer(response.content, dtype=np.uint8)
+                return cv2.imdecode(arr, cv2.IMREAD_COLOR)
         except Exception as e:
             print(f"Error capturing image: {str(e)}")
         return None
 
-    # Rest of the class methods remain the same
-    def detect_objects(self, image):
-        if image is None:
-            return set(), None
-        
-        results = self.model(image, conf=0.5)
-        detected_objects = set()
-        annotated_image = image.copy()
-        
-        for result in results:
-            for box in result.boxes:
-                coords = box.xyxy[0].cpu().numpy()
-                class_id = int(box.cls[0])
-                class_name = result.names[class_id]
-                confidence = float(box.conf[0])
+    def open_stream(self) -> requests.Response:
+        """Connect to the ESP32 MJPEG stream"""
+        response = self.http.get(f"{self.esp32_url}:81/stream", stream=True, timeout=5)
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            response.close()
+            raise
+        return response
+
+    def stream_frames(self, response: requests.Response):
+        """Yield decoded frames from an open MJPEG stream"""
+        buf = bytearray()
+        for chunk in response.iter_content(chunk_size=4096):
+            buf += chunk
+            # Each multipart part holds one JPEG delimited by its SOI/EOI markers
+            while True:
+                start = buf.find(b'\xff\xd8')
+                end = buf.find(b'\xff\xd9', start + 2) if start != -1 else -1
+                if end == -1:
+                    break
+                arr = np.frombuffer(bytes(buf[start:end + 2]), dtype=np.uint8)
+                del buf[:end + 2]
+                image = cv2.imdecode(arr, cv2.IMREAD_COLOR)
+                if image is not None:
+                    yield image
+
+    def push_frame(self, image):
+        """Queue a frame, dropping stale frames rather than stalling the camera"""
+        while True:
+            try:
+                self.frames.put_nowait(image)
+                return
+            except queue.Full:
+                try:
+                    self.frames.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def capture_loop(self):
+        """Producer thread: capture frames while the main loop runs inference"""
+        use_stream = True
+        connected_once = False
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                if not use_stream:
+                    image = self.capture_image()
+                    if image is None:
+                        # Camera unreachable: back off instead of spinning on errors
+                        self._stop.wait(backoff)
+                        backoff = min(backoff * 2, 10)
+                        continue
+                    self.push_frame(image)
+                    backoff = 1
+                    if self.capture_interval:
+                        time.sleep(self.capture_interval)
+                    continue
                 
-                detected_objects.add(class_name)
+                try:
+                    response = self.open_stream()
+                except (requests.ConnectionError, requests.HTTPError) as e:
+                    # Fall back to polling /capture only if the stream was never reachable
+                    not_found = isinstance(e, requests.HTTPError) and \
+                        e.response is not None and e.response.status_code == 404
+                    if not connected_once and (not_found or isinstance(e, requests.ConnectionError)):
+                        print(f"MJPEG stream unavailable, polling /capture: {str(e)}")
+                        use_stream = False
+                        continue
+                    raise
                 
-                x1, y1, x2, y2 = map(int, coords)
-                cv2.rectangle(annotated_image, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                label = f"{class_name} {confidence:.2f}"
+                connected_once = True
+                with response:
+                    for image in self.stream_frames(response):
+                        if self._stop.is_set():
+                            return
+                        self.push_frame(image)
+                        backoff = 1
+                print(f"MJPEG stream closed, reconnecting in {backoff}s")
+            except requests.RequestException as e:
+                print(f"MJPEG stream interrupted, reconnecting in {backoff}s: {str(e)}")
+            except Exception as e:
+                print(f"Error in capture loop: {str(e)}")
+            
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 10)
+
+    def next_batch(self):
+        """Wait for one frame, then drain up to batch_size frames from the queue"""
+        try:
+            batch = [self.frames.get(timeout=1)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.frames.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def frame_changed(self, image) -> bool:
+        """Cheaply check whether a frame differs from the last processed one"""
+        small = cv2.resize(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), (32, 32),
+                           interpolation=cv2.INTER_AREA)
+        if self._prev_small is not None and \
+                cv2.absdiff(small, self._prev_small).mean() < self.diff_threshold:
+            return False
+        self._prev_small = small
+        return True
+
+    def preprocess(self, images):
+        """Upload raw BGR frames and letterbox them on the GPU into the FP16 input batch"""
+        n = len(images)
+        for i, image in enumerate(images):
+            h, w = image.shape[:2]
+            staging = self._pinned[i]
+            if staging is None or staging.shape != image.shape:
+                staging = torch.empty(image.shape, dtype=torch.uint8, pin_memory=True)
+                self._pinned[i] = staging
+                self._frame_gpu[i] = torch.empty(image.shape, dtype=torch.uint8, device='cuda')
+                self._float_gpu[i] = torch.empty((1, 3, h, w), dtype=torch.float32, device='cuda')
+            np.copyto(staging.numpy(), image)
+            
+            frame = self._frame_gpu[i]
+            frame.copy_(staging, non_blocking=True)
+            # BGR -> RGB while converting to float, one channel at a time to avoid temporaries
+            rgb = self._float_gpu[i]
+            for c in range(3):
+                rgb[0, c].copy_(frame[..., 2 - c])
+            
+            # Letterbox like Ultralytics: keep aspect ratio, pad the rest with gray (114)
+            r = min(self.imgsz / h, self.imgsz / w)
+            nh, nw = round(h * r), round(w * r)
+            top, left = (self.imgsz - nh) // 2, (self.imgsz - nw) // 2
+            if (nh, nw) != (h, w):
+                rgb = F.interpolate(rgb, size=(nh, nw), mode='bilinear', align_corners=False)
+            
+            dst = self._gpu[i]
+            dst.fill_(114 / 255)
+            region = dst[:, top:top + nh, left:left + nw]
+            region.copy_(rgb[0])
+            region.div_(255)
+            self._letterbox[i] = (r, left, top)
+        
+        # A static-shape engine needs exactly batch_size inputs; extra rows are ignored
+        return self._gpu if self.static_batch else self._gpu[:n]
+
+    def detect_objects(self, images, verbose=True):
+        """Run YOLO once over a batch of frames, returning (objects, annotated) per frame"""
+        if not images:
+            return []
+        
+        # Set when boxes come back in letterboxed imgsz space rather than frame space
+        letterboxed = False
+        predictor = self.model.predictor
+        if self._gpu is None:
+            results = self.model(images, conf=0.5, imgsz=self.imgsz, verbose=verbose)
+        elif predictor is None:
+            # First call (warmup) goes through the public API to set up the predictor
+            inputs = self.preprocess(images)
+            results = self.model(inputs, conf=0.5, imgsz=self.imgsz, half=True, verbose=verbose)
+            letterboxed = True
+        else:
+            # Given only the tensor batch, postprocess would copy the whole batch back
+            # to the host as orig_imgs; hand it the original frames instead, which also
+            # maps boxes back to frame coordinates
+            inputs = self.preprocess(images)
+            with torch.inference_mode():
+                preds = predictor.inference(inputs)
+                results = predictor.postprocess(preds, inputs, images)
+        detections = []
+        
+        for i, (image, result) in enumerate(zip(images, results)):
+            # Frames are not reused after detection, so annotate in place
+            annotated_image = image
+            # Pull all boxes off the device in three bulk transfers
+            boxes = result.boxes
+            xyxy = boxes.xyxy.cpu().numpy()
+            if letterboxed:
+                # Undo the letterbox padding and scale
+                r, left, top = self._letterbox[i]
+                h, w = image.shape[:2]
+                xyxy = (xyxy - (left, top, left, top)) / r
+                xyxy = np.clip(xyxy, 0, (w - 1, h - 1, w - 1, h - 1))
+            xyxy = xyxy.astype(np.int32).tolist()
+            cls = boxes.cls.cpu().numpy().astype(np.int32).tolist()
+            conf = boxes.conf.cpu().numpy().tolist()
+            detected_objects = {self._names[class_id] for class_id in cls}
+            
+            for (x1, y1, x2, y2), class_id, confidence in zip(xyxy, cls, conf):
+                color = self._colors[class_id]
+                cv2.rectangle(annotated_image, (x1, y1), (x2, y2), color, 2)
+                label = self._label_fmt[class_id] + f"{confidence:.2f}"
                 cv2.putText(annotated_image, label, (x1, y1 - 10),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+            detections.append((detected_objects, annotated_image))
         
-        return detected_objects, annotated_image
+        return detections
 
     def save_image(self, image, objects):
         if image is None or not objects:
             return
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        objects_str = "-".join(sorted(objects))
-        filename = f"{timestamp}_{objects_str}.jpg"
-        filepath = os.path.join(self.output_dir, filename)
+        now = time.monotonic()
+        elapsed = now - self._last_save
+        if elapsed < self.min_save_interval:
+            return
+        key = frozenset(objects)
+        if key == self._last_key:
+            if elapsed < self.save_interval:
+                return
+            objects_str = self._last_str
+        else:
+            objects_str = "-".join(sorted(objects))
+            self._last_key, self._last_str = key, objects_str
+        self._last_save = now
+        
+        wall = time.time()
+        timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(wall))
+        millis = int(wall * 1000) % 1000
+        filepath = f"{self._out_prefix}{timestamp}_{millis:03d}_{objects_str}.jpg"
         
-        cv2.imwrite(filepath, image)
+        ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 80,
+                                               cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+        if not ok:
+            print(f"Error encoding image: {filepath}")
+            return
+        self._writer.submit(self.write_file, filepath, buf.tobytes())
+
+    def write_file(self, filepath, data):
+        """Writer thread: flush an encoded image to disk"""
+        try:
+            with open(filepath, 'wb') as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Error saving image {filepath}: {str(e)}")
+            return
         print(f"Saved image: {filepath}")
 
+    def speech_loop(self):
+        """Worker thread: speak the most recent pending phrase"""
+        try:
+            engine = pyttsx3.init()
+            engine.setProperty('rate', 150)
+        except Exception as e:
+            print(f"Error initializing text-to-speech: {str(e)}")
+            self._tts_ready.set()
+            return
+        self._tts_ok = True
+        self._tts_ready.set()
+        
+        while True:
+            text = self._tts_q.get()
+            try:
+                engine.say(text)
+                engine.runAndWait()
+            except Exception as e:
+                print(f"Error announcing objects: {str(e)}")
+
+    def queue_phrase(self, text):
+        """Hand a phrase to the speech worker, replacing any phrase it hasn't started"""
+        while True:
+            try:
+                self._tts_q.put_nowait(text)
+                return
+            except queue.Full:
+                try:
+                    self._tts_q.get_nowait()
+                except queue.Empty:
+                    pass
+
     def announce_objects(self, objects):
         if not objects:
             return
@@ -155,36 +588,50 @@ class ESP32ObjectDetector:
         if new_objects:
             objects_text = ", ".join(new_objects)
             print(f"Detected: {objects_text}")
-            self.engine.say(f"I see {objects_text}")
-            self.engine.runAndWait()
+            if self._tts_ok:
+                self.queue_phrase(f"I see {objects_text}")
         
-        self.last_announced = objects
+        self.last_announced = frozenset(objects)
 
     def run(self):
         print("Starting object detection...")
         print(f"Saving images to: {os.path.abspath(self.output_dir)}")
+        capture_thread = threading.Thread(target=self.capture_loop, daemon=True)
+        capture_thread.start()
         try:
             while True:
-                image = self.capture_image()
-                if image is not None:
-                    detected_objects, annotated_image = self.detect_objects(image)
-                    
+                batch = self.next_batch()
+                # Static scene: keep showing the previous annotated frame
+                batch = [image for image in batch if self.frame_changed(image)]
+                if not batch:
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+                    continue
+                
+                all_objects = set()
+                quit_requested = False
+                for detected_objects, annotated_image in self.detect_objects(batch):
                     if detected_objects:
                         self.save_image(annotated_image, detected_objects)
-                        self.announce_objects(detected_objects)
+                        all_objects |= detected_objects
                     
                     cv2.imshow('ESP32 Camera Feed', annotated_image)
                     
                     if cv2.waitKey(1) & 0xFF == ord('q'):
+                        quit_requested = True
                         break
                 
-                time.sleep(self.capture_interval)
+                self.announce_objects(all_objects)
+                if quit_requested:
+                    break
                 
         except KeyboardInterrupt:
             print("\nStopping object detection...")
         except Exception as e:
             print(f"Error in detection loop: {str(e)}")
         finally:
+            self._stop.set()
+            self._writer.shutdown(wait=True)
             cv2.destroyAllWindows()
 
 def main():